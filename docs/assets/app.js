@@ -1,5 +1,6 @@
 const DATA_URL = "data/pokemon.json";
 const MAX_BASE_STAT = 255;
+const RENDER_CHUNK_SIZE = 120;
 
 const GENERATION_FILTERS = [
 	{ id: "all", label: "全部世代" },
@@ -65,6 +66,9 @@ const elements = {
 	rangeEndInput: document.querySelector("#range-end"),
 };
 
+const searchBlobs = new WeakMap();
+let renderToken = 0;
+
 const padId = (id) => String(id).padStart(3, "0");
 const clampNumber = (value, min, max) => Math.min(Math.max(value, min), max);
 
@@ -295,7 +299,7 @@ function matchesRange(pokemon) {
 }
 
 function applyFilters() {
-	const term = state.searchTerm;
+	const term = state.searchTerm.toLowerCase();
 	const typeFilters = state.activeTypes;
 	state.filtered = state.all.filter(
 		(pokemon) =>
@@ -446,6 +450,7 @@ async function bootstrap() {
 		}
 		const payload = await response.json();
 		state.all = payload.pokemon ?? [];
+		state.all.forEach((pokemon) => searchBlobs.set(pokemon, buildSearchBlob(pokemon)));
 		state.filtered = state.all;
 		updateIdBounds();
 		updateMeta(payload);
@@ -465,17 +470,17 @@ function updateMeta(payload) {
 	elements.updated.textContent = updatedText ? `导出时间：${updatedText}` : "";
 }
 
+function buildSearchBlob(pokemon) {
+	const names = pokemon.names ?? {};
+	return [padId(pokemon.id), pokemon.slug ?? "", names.en ?? "", names.zh ?? "", names.ja ?? ""]
+		.join("\u0000")
+		.toLowerCase();
+}
+
 function matchesTerm(pokemon, term) {
 	if (!term) return true;
-	const normalized = term.toLowerCase();
-	const names = pokemon.names ?? {};
-	return (
-		padId(pokemon.id).includes(normalized) ||
-		(pokemon.slug ?? "").toLowerCase().includes(normalized) ||
-		(names.en ?? "").toLowerCase().includes(normalized) ||
-		(names.zh ?? "").toLowerCase().includes(normalized) ||
-		(names.ja ?? "").toLowerCase().includes(normalized)
-	);
+	const blob = searchBlobs.get(pokemon) ?? buildSearchBlob(pokemon);
+	return blob.includes(term);
 }
 
 function handleSearch() {
@@ -484,10 +489,23 @@ function handleSearch() {
 }
 
 function renderCards(list) {
+	const token = ++renderToken;
 	if (!list.length) {
 		elements.grid.innerHTML = `<div class="empty-state">没有找到匹配的宝可梦，换个关键字试试吧。</div>`;
 		return;
 	}
+	elements.grid.replaceChildren(buildCardFragment(list.slice(0, RENDER_CHUNK_SIZE)));
+	let offset = RENDER_CHUNK_SIZE;
+	const appendNextChunk = () => {
+		if (token !== renderToken || offset >= list.length) return;
+		elements.grid.appendChild(buildCardFragment(list.slice(offset, offset + RENDER_CHUNK_SIZE)));
+		offset += RENDER_CHUNK_SIZE;
+		requestAnimationFrame(appendNextChunk);
+	};
+	requestAnimationFrame(appendNextChunk);
+}
+
+function buildCardFragment(list) {
 	const fragment = document.createDocumentFragment();
 	list.forEach((pokemon) => {
 		const card = document.createElement("button");
@@ -513,7 +531,7 @@ function renderCards(list) {
 		`;
 		fragment.appendChild(card);
 	});
-	elements.grid.replaceChildren(fragment);
+	return fragment;
 }
 
 function renderTypes(types = []) {
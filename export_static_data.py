@@ -8,11 +8,24 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sqlite3
+import zlib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TypedDict
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional
+    msgspec = None
 
 BASE_DIR = Path(__file__).resolve().parent
 DEFAULT_DB = BASE_DIR / "pokeindex.db"
@@ -30,6 +43,85 @@ GENERATION_LABELS = {
     "generation-ix": {"label": "第九世代", "index": 9},
 }
 
+READ_PRAGMAS = (
+    "PRAGMA query_only = ON;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA cache_size = -65536;",
+    "PRAGMA temp_store = MEMORY;",
+)
+
+DESCRIPTION_LANGUAGE_RANK = {"zh-hans": 0, "zh-hant": 1, "ja": 2, "ja-hrkt": 3, "en": 4}
+FALLBACK_LANGUAGE_RANK = len(DESCRIPTION_LANGUAGE_RANK)
+FLAVOR_TEXT_TRANSLATION = str.maketrans({"\n": " ", "\u000c": " "})
+
+SPRITE_KEYS = ("official-artwork", "home", "dream_world")
+
+STAT_ORDER = (
+    "hp",
+    "attack",
+    "defense",
+    "special-attack",
+    "special-defense",
+    "speed",
+)
+STAT_LABELS = tuple(name.upper().replace("-", " ") for name in STAT_ORDER)
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class NamedResource(TypedDict, total=False):
+    name: Optional[str]
+
+
+class LocalizedName(TypedDict, total=False):
+    name: Optional[str]
+    language: Optional[NamedResource]
+
+
+class FlavorText(TypedDict, total=False):
+    flavor_text: Optional[str]
+    language: Optional[NamedResource]
+
+
+class SpriteSet(TypedDict, total=False):
+    front_default: Optional[str]
+
+
+class Sprites(TypedDict, total=False):
+    front_default: Optional[str]
+    other: Dict[str, Optional[SpriteSet]]
+
+
+class SpeciesDocument(TypedDict, total=False):
+    """Subset of a PokeAPI species payload that the export actually reads."""
+
+    name: Optional[str]
+    names: List[LocalizedName]
+    flavor_text_entries: List[FlavorText]
+    evolves_from_species: Optional[NamedResource]
+    egg_groups: List[NamedResource]
+    generation: Optional[NamedResource]
+
+
+class PokemonDocument(TypedDict, total=False):
+    """Subset of a PokeAPI pokemon payload that the export actually reads."""
+
+    sprites: Sprites
+    height: Optional[int]
+    weight: Optional[int]
+    base_experience: Optional[int]
+
+
+ParsedRow = Tuple[Dict, Optional[str], Optional[str]]
+
+
+if msgspec is not None:
+    _decode_pokemon = msgspec.json.Decoder(PokemonDocument).decode
+    _decode_species = msgspec.json.Decoder(SpeciesDocument).decode
+else:
+    _decode_pokemon = _loads
+    _decode_species = _loads
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Export Pokédex data to JSON")
@@ -45,6 +137,17 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_OUTPUT,
         help=f"Destination JSON file (default: {DEFAULT_OUTPUT})",
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Write indented JSON instead of the compact streamed output.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to decode rows; 1 disables the pool (default: CPU count)",
+    )
     return parser.parse_args()
 
 
@@ -53,6 +156,8 @@ def get_connection(db_path: Path) -> sqlite3.Connection:
         raise FileNotFoundError(f"Database not found: {db_path}")
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
@@ -82,26 +187,34 @@ def extract_localized_names(species: Dict) -> Dict[str, str]:
 
 
 def pick_description(species: Dict) -> str:
-    preferred = ("zh-hans", "zh-hant", "ja", "ja-hrkt", "en")
-    cache: Dict[str, str] = {}
+    best_rank = FALLBACK_LANGUAGE_RANK + 1
+    best_text = ""
     for entry in species.get("flavor_text_entries", []):
         lang_raw = entry.get("language", {}).get("name")
-        lang = lang_raw.lower() if lang_raw else None
+        if not lang_raw:
+            continue
         text = entry.get("flavor_text")
-        if not lang or not text:
+        if not text:
             continue
-        cleaned = text.replace("\n", " ").replace("\u000c", " ")
-        cache.setdefault(lang, cleaned)
-    for language in preferred:
-        if cache.get(language):
-            return cache[language]
-    return next(iter(cache.values()), "")
+        rank = DESCRIPTION_LANGUAGE_RANK.get(lang_raw.lower(), FALLBACK_LANGUAGE_RANK)
+        if rank < best_rank:
+            best_rank = rank
+            best_text = text
+            if rank == 0:
+                break
+    return best_text.translate(FLAVOR_TEXT_TRANSLATION)
 
 
 def extract_sprite(pokemon: Dict) -> str:
-    other = pokemon.get("sprites", {}).get("other", {})
-    for key in ("official-artwork", "home", "dream_world"):
-        candidate = other.get(key, {}).get("front_default")
+    try:
+        other = pokemon["sprites"]["other"]
+    except (KeyError, TypeError):
+        other = {}
+    for key in SPRITE_KEYS:
+        try:
+            candidate = other[key]["front_default"]
+        except (KeyError, TypeError):
+            continue
         if candidate:
             return candidate
     return pokemon.get("sprites", {}).get("front_default") or ""
@@ -131,22 +244,8 @@ def collect_abilities(conn: sqlite3.Connection) -> Dict[int, List[Dict[str, bool
     return mapping
 
 
-def stat_order() -> List[str]:
-    return [
-        "hp",
-        "attack",
-        "defense",
-        "special-attack",
-        "special-defense",
-        "speed",
-    ]
-
-
 def empty_stats() -> List[Dict[str, int]]:
-    return [
-        {"label": name.upper().replace("-", " "), "base": 0}
-        for name in stat_order()
-    ]
+    return [{"label": label, "base": 0} for label in STAT_LABELS]
 
 
 def collect_stats(conn: sqlite3.Connection) -> Dict[int, List[Dict[str, int]]]:
@@ -156,18 +255,14 @@ def collect_stats(conn: sqlite3.Connection) -> Dict[int, List[Dict[str, int]]]:
         FROM pokemon_stats
         """
     ).fetchall()
-    order = stat_order()
-    grouped: Dict[int, Dict[str, Dict[str, int]]] = defaultdict(dict)
+    grouped: Dict[int, Dict[str, int]] = defaultdict(dict)
     for row in rows:
-        grouped[row[0]][row[1]] = {"label": row[1], "base": row[2]}
+        grouped[row[0]][row[1]] = row[2]
     prepared: Dict[int, List[Dict[str, int]]] = {}
     for pokemon_id, stats_map in grouped.items():
         prepared[pokemon_id] = [
-            {
-                "label": name.upper().replace("-", " "),
-                "base": stats_map.get(name, {"base": 0}).get("base", 0),
-            }
-            for name in order
+            {"label": label, "base": stats_map.get(name, 0)}
+            for name, label in zip(STAT_ORDER, STAT_LABELS)
         ]
     return prepared
 
@@ -187,103 +282,137 @@ def extract_generation(species: Dict) -> Dict[str, object]:
     return {"slug": slug, "label": label, "index": index}
 
 
-def build_evolution_index(rows: Sequence[sqlite3.Row]) -> Dict[str, Dict]:
+def build_evolution_index(rows: Sequence[ParsedRow]) -> Dict[str, Dict]:
     index: Dict[str, Dict] = {}
     children: Dict[str, List[str]] = defaultdict(list)
-    for row in rows:
-        species = json.loads(row["species_json"])
-        species_name = species.get("name")
+    for entry, species_name, parent in rows:
         if not species_name:
             continue
-        names = extract_localized_names(species)
-        parent = (species.get("evolves_from_species") or {}).get("name")
+        names = entry["names"]
+        is_new = species_name not in index
         index[species_name] = {
-            "id": row["id"],
-            "slug": row["name"],
+            "id": entry["id"],
+            "slug": entry["slug"],
             "names": names,
+            "display_name": names.get("zh") or names.get("en"),
             "parent": parent,
         }
-        if parent:
+        if parent and is_new:
             children[parent].append(species_name)
     for siblings in children.values():
         siblings.sort()
     return {"index": index, "children": children}
 
 
-def build_chain(species_name: str, index: Dict[str, Dict], children: Dict[str, List[str]]):
-    if species_name not in index:
-        return []
+def find_chain_root(species_name: str, index: Dict[str, Dict]) -> str:
     root = species_name
-    while index.get(root, {}).get("parent") and index[root]["parent"] in index:
-        root = index[root]["parent"]
+    seen = {root}
+    while True:
+        parent = index.get(root, {}).get("parent")
+        if not parent or parent not in index or parent in seen:
+            return root
+        seen.add(parent)
+        root = parent
+
+
+def build_chain_from_root(root: str, index: Dict[str, Dict], children: Dict[str, List[str]]):
     stages: List[List[Dict]] = []
-    current = [root]
-    visited = set()
-    while current:
-        stage_entries = []
-        next_stage: List[str] = []
-        for name in current:
-            if name in visited or name not in index:
-                continue
-            visited.add(name)
-            node = index[name]
-            stage_entries.append(
-                {
-                    "id": node["id"],
-                    "slug": node["slug"],
-                    "names": node["names"],
-                    "display_name": node["names"].get("zh") or node["names"].get("en"),
-                }
-            )
-            next_stage.extend(children.get(name, []))
-        if stage_entries:
-            stage_entries.sort(key=lambda item: item["id"])
-            stages.append(stage_entries)
-        current = next_stage
+    level = [root] if root in index else []
+    visited = set(level)
+    while level:
+        stage_entries = [
+            {
+                "id": index[name]["id"],
+                "slug": index[name]["slug"],
+                "names": index[name]["names"],
+                "display_name": index[name]["display_name"],
+            }
+            for name in level
+        ]
+        stage_entries.sort(key=lambda item: item["id"])
+        stages.append(stage_entries)
+        level = [child for name in level for child in children.get(name, []) if child not in visited]
+        visited.update(level)
     return stages
 
 
-def build_all_chains(rows: Sequence[sqlite3.Row]) -> Dict[str, List[List[Dict]]]:
+def build_all_chains(rows: Sequence[ParsedRow]) -> Dict[str, List[List[Dict]]]:
     graph = build_evolution_index(rows)
     index = graph["index"]
     children = graph["children"]
     chains: Dict[str, List[List[Dict]]] = {}
+    by_root: Dict[str, List[List[Dict]]] = {}
     for species_name in index.keys():
-        chains[species_name] = build_chain(species_name, index, children)
+        root = find_chain_root(species_name, index)
+        if root not in by_root:
+            by_root[root] = build_chain_from_root(root, index, children)
+        chains[species_name] = by_root[root]
     return chains
 
 
-def serialize_dataset(conn: sqlite3.Connection) -> Dict:
+def decode_blob(data: bytes, codec: Optional[str]) -> bytes:
+    if not codec:
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unsupported JSON codec: {codec}")
+
+
+def build_entry(row: Tuple[int, str, bytes, bytes, Optional[str]]) -> ParsedRow:
+    pokemon_id, slug, pokemon_json, species_json, codec = row
+    pokemon_blob = _decode_pokemon(decode_blob(pokemon_json, codec))
+    species_blob = _decode_species(decode_blob(species_json, codec))
+    entry = {
+        "id": pokemon_id,
+        "slug": slug,
+        "names": extract_localized_names(species_blob),
+        "sprite": extract_sprite(pokemon_blob),
+        "description": pick_description(species_blob),
+        "types": [],
+        "abilities": [],
+        "stats": [],
+        "egg_groups": get_egg_groups(species_blob),
+        "generation": extract_generation(species_blob),
+        "height": pokemon_blob.get("height"),
+        "weight": pokemon_blob.get("weight"),
+        "base_experience": pokemon_blob.get("base_experience"),
+        "evolution_chain": [],
+    }
+    parent = (species_blob.get("evolves_from_species") or {}).get("name")
+    return entry, species_blob.get("name"), parent
+
+
+def serialize_dataset(conn: sqlite3.Connection, workers: int = 1) -> Dict:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pokemon)")}
+    codec_column = "json_codec" if "json_codec" in columns else "NULL"
     rows = conn.execute(
-        "SELECT id, name, pokemon_json, species_json FROM pokemon ORDER BY id"
-    ).fetchall()
+        f"""
+        SELECT id, name,
+               CAST(pokemon_json AS BLOB) AS pokemon_json,
+               CAST(species_json AS BLOB) AS species_json,
+               {codec_column} AS json_codec
+        FROM pokemon
+        ORDER BY id
+        """
+    )
+    records = (tuple(row) for row in rows)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed: List[ParsedRow] = list(executor.map(build_entry, records, chunksize=64))
+    else:
+        parsed = [build_entry(record) for record in records]
     types = collect_types(conn)
     abilities = collect_abilities(conn)
     stats = collect_stats(conn)
-    chains = build_all_chains(rows)
+    chains = build_all_chains(parsed)
 
     dataset = []
-    for row in rows:
-        pokemon_blob = json.loads(row["pokemon_json"])
-        species_blob = json.loads(row["species_json"])
-        species_name = species_blob.get("name")
-        names = extract_localized_names(species_blob)
-        entry = {
-            "id": row["id"],
-            "slug": row["name"],
-            "names": names,
-            "sprite": extract_sprite(pokemon_blob),
-            "description": pick_description(species_blob),
-            "types": types.get(row["id"], []),
-            "abilities": abilities.get(row["id"], []),
-            "stats": stats.get(row["id"], empty_stats()),
-            "egg_groups": get_egg_groups(species_blob),
-            "generation": extract_generation(species_blob),
-            "height": pokemon_blob.get("height"),
-            "weight": pokemon_blob.get("weight"),
-            "base_experience": pokemon_blob.get("base_experience"),
-            "evolution_chain": chains.get(species_name, []),
-        }
+    for entry, species_name, _parent in parsed:
+        pokemon_id = entry["id"]
+        entry["types"] = types.get(pokemon_id, [])
+        entry["abilities"] = abilities.get(pokemon_id, [])
+        entry["stats"] = stats.get(pokemon_id) or empty_stats()
+        entry["evolution_chain"] = chains.get(species_name, [])
         dataset.append(entry)
 
     return {
@@ -293,15 +422,44 @@ def serialize_dataset(conn: sqlite3.Connection) -> Dict:
     }
 
 
+def _dumps(value: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_payload(payload: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_payload(output_path: Path, payload: Dict) -> None:
+    with output_path.open("wb") as handle:
+        handle.write(b'{"generated_at":')
+        handle.write(_dumps(payload["generated_at"]))
+        handle.write(b',"total":')
+        handle.write(_dumps(payload["total"]))
+        handle.write(b',"pokemon":[')
+        for position, entry in enumerate(payload["pokemon"]):
+            if position:
+                handle.write(b",")
+            handle.write(_dumps(entry))
+        handle.write(b"]}")
+
+
 def main() -> None:
     args = parse_args()
     output_path = args.output
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     with get_connection(args.db_path) as conn:
-        payload = serialize_dataset(conn)
+        payload = serialize_dataset(conn, workers=args.workers)
 
-    output_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.pretty:
+        output_path.write_bytes(encode_payload(payload))
+    else:
+        write_payload(output_path, payload)
     print(f"Exported {payload['total']} Pokémon entries to {output_path}")
 
 
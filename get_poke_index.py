@@ -3,32 +3,130 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
+import queue
 import sqlite3
 import sys
+import threading
 import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from sqlite3 import Connection as SQLiteConnection
 from sqlite3 import Cursor as SQLiteCursor
 from sqlite3 import Error as SQLiteError
-from typing import Dict, Generator, Iterable, Optional
+from typing import Dict, Generator, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+	import apsw
+except ImportError:  # optional
+	apsw = None
+
+try:
+	import orjson
+except ImportError:  # optional
+	orjson = None
+
+try:
+	import simdjson
+except ImportError:  # optional
+	simdjson = None
+
+try:
+	import requests_cache
+except ImportError:  # optional
+	requests_cache = None
+
 API_BASE = "https://pokeapi.co/api/v2"
-DEFAULT_PAGE_SIZE = 200
-DEFAULT_RATE_DELAY = 0.2
+DATABASE_ERRORS: Tuple[type, ...] = (SQLiteError, apsw.Error) if apsw is not None else (SQLiteError,)
 MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = MAX_PAGE_SIZE
+DEFAULT_RATE_DELAY = 0.2
+DEFAULT_CONCURRENCY = 8
+DEFAULT_HTTP_CACHE_EXPIRE = 7 * 24 * 60 * 60
+PAGE_PREFETCH = 2
 BASE_DIR = Path(__file__).resolve().parent
 DEFAULT_DB_PATH = BASE_DIR / "pokeindex.db"
+DEFAULT_MAX_SQL_VARIABLES = 999
+BUSY_TIMEOUT_MS = 5000
+JSON_CODEC = "zlib"
+JSON_COMPRESSION_LEVEL = 6
+POKEMON_COLUMNS = (
+	"id",
+	"name",
+	"base_experience",
+	"height",
+	"weight",
+	"pokemon_order",
+	"is_default",
+	"location_area_encounters",
+	"species_name",
+	"species_color",
+	"species_capture_rate",
+	"species_base_happiness",
+	"species_growth_rate",
+	"habitat",
+	"shape",
+	"is_baby",
+	"is_legendary",
+	"is_mythical",
+	"hatch_counter",
+	"gender_rate",
+	"generation",
+	"pokemon_json",
+	"species_json",
+	"json_codec",
+	"content_hash",
+)
+SPECIES_SCALAR_FIELDS = (
+	"name",
+	"capture_rate",
+	"base_happiness",
+	"is_baby",
+	"is_legendary",
+	"is_mythical",
+	"hatch_counter",
+	"gender_rate",
+)
+SPECIES_RESOURCE_FIELDS = ("color", "growth_rate", "habitat", "shape", "generation")
+CHILD_TABLES = {
+	"pokemon_abilities": (("pokemon_id", "ability_name", "slot", "is_hidden"), ("pokemon_id", "ability_name")),
+	"pokemon_types": (("pokemon_id", "slot", "type_name"), ("pokemon_id", "slot")),
+	"pokemon_stats": (("pokemon_id", "stat_name", "base_stat", "effort"), ("pokemon_id", "stat_name")),
+	"pokemon_moves": (
+		("pokemon_id", "move_name", "version_group", "learn_method", "level_learned_at"),
+		("pokemon_id", "move_name", "version_group", "learn_method", "level_learned_at"),
+	),
+	"pokemon_held_items": (
+		("pokemon_id", "item_name", "version_name", "rarity"),
+		("pokemon_id", "item_name", "version_name"),
+	),
+	"pokemon_game_indices": (("pokemon_id", "version_name", "game_index"), ("pokemon_id", "version_name")),
+	"pokemon_forms": (("pokemon_id", "form_name"), ("pokemon_id", "form_name")),
+	"pokemon_past_types": (
+		("pokemon_id", "generation_name", "slot", "type_name"),
+		("pokemon_id", "generation_name", "slot"),
+	),
+}
+INGEST_PRAGMAS = (
+	"PRAGMA journal_mode = WAL;",
+	"PRAGMA synchronous = NORMAL;",
+	"PRAGMA temp_store = MEMORY;",
+	"PRAGMA cache_size = -65536;",
+	"PRAGMA mmap_size = 268435456;",
+)
 
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
 	parser = argparse.ArgumentParser(
 		description="Download Pokédex data from PokeAPI and persist it locally."
 	)
@@ -63,7 +161,13 @@ def parse_args() -> argparse.Namespace:
 		"--sleep",
 		type=float,
 		default=DEFAULT_RATE_DELAY,
-		help="Seconds to wait between API requests to stay within rate limits.",
+		help="Minimum seconds between API requests across all workers, to stay within rate limits.",
+	)
+	parser.add_argument(
+		"--concurrency",
+		type=int,
+		default=DEFAULT_CONCURRENCY,
+		help="Number of worker threads fetching from PokeAPI in parallel.",
 	)
 	parser.add_argument(
 		"--batch-size",
@@ -71,6 +175,27 @@ def parse_args() -> argparse.Namespace:
 		default=25,
 		help="Commit to the database after processing this many Pokémon.",
 	)
+	parser.add_argument(
+		"--bulk-load",
+		action="store_true",
+		help="Disable foreign key enforcement during the sync and verify it once at the end (exit status 1 on violations).",
+	)
+	parser.add_argument(
+		"--reconcile",
+		action="store_true",
+		help="Rewrite every Pokémon even if its content hash is unchanged.",
+	)
+	parser.add_argument(
+		"--http-cache",
+		action="store_true",
+		help="Cache API responses next to the database (<db>.httpcache, needs requests-cache).",
+	)
+	parser.add_argument(
+		"--http-cache-expire",
+		type=int,
+		default=DEFAULT_HTTP_CACHE_EXPIRE,
+		help="Seconds before cached API responses are revalidated (default: one week).",
+	)
 	parser.add_argument(
 		"--max-retries",
 		type=int,
@@ -88,7 +213,7 @@ def parse_args() -> argparse.Namespace:
 		default=os.getenv("POKE_LOG_LEVEL", "INFO"),
 		help="Python logging level (DEBUG, INFO, ...).",
 	)
-	return parser.parse_args()
+	return parser.parse_args(argv)
 
 
 def configure_logging(level: str) -> None:
@@ -100,7 +225,14 @@ def configure_logging(level: str) -> None:
 	)
 
 
-def build_session(max_retries: int, backoff: float) -> requests.Session:
+def build_session(
+	max_retries: int,
+	backoff: float,
+	pool_size: int = DEFAULT_CONCURRENCY,
+	cache_path: Optional[Path] = None,
+	cache_expire: int = DEFAULT_HTTP_CACHE_EXPIRE,
+	limiter: Optional[RateLimiter] = None,
+) -> requests.Session:
 	retry = Retry(
 		total=max_retries,
 		read=max_retries,
@@ -111,135 +243,251 @@ def build_session(max_retries: int, backoff: float) -> requests.Session:
 		allowed_methods=frozenset(["GET"]),
 		raise_on_status=False,
 	)
-	adapter = HTTPAdapter(max_retries=retry)
-	session = requests.Session()
+	adapter = RateLimitedAdapter(
+		limiter,
+		pool_connections=4,
+		pool_maxsize=max(1, pool_size),
+		max_retries=retry,
+	)
+	if cache_path is not None and requests_cache is not None:
+		session = requests_cache.CachedSession(
+			cache_name=str(cache_path),
+			backend="sqlite",
+			expire_after=cache_expire,
+			stale_if_error=True,
+		)
+	else:
+		if cache_path is not None:
+			logging.warning("requests-cache is not installed; continuing without an HTTP cache")
+		session = requests.Session()
 	session.mount("https://", adapter)
 	session.mount("http://", adapter)
 	session.headers.update({"User-Agent": "pokeindex-sync/1.0"})
 	return session
 
 
-def connect_database(args: argparse.Namespace) -> SQLiteConnection:
+class RateLimiter:
+	def __init__(self, period: float) -> None:
+		self.period = max(0.0, period)
+		self.acquired = 0
+		self._lock = threading.Lock()
+		self._next_allowed = 0.0
+
+	def acquire(self) -> None:
+		with self._lock:
+			self.acquired += 1
+			if not self.period:
+				return
+			now = time.monotonic()
+			wait = max(0.0, self._next_allowed - now)
+			self._next_allowed = max(now, self._next_allowed) + self.period
+		if wait:
+			time.sleep(wait)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+	"""Throttles network sends only; requests-cache hits never reach the adapter."""
+
+	def __init__(self, limiter: Optional[RateLimiter] = None, **kwargs) -> None:
+		self.limiter = limiter
+		super().__init__(**kwargs)
+
+	def send(self, request, **kwargs):
+		if self.limiter is not None:
+			self.limiter.acquire()
+		return super().send(request, **kwargs)
+
+
+class ApswCursor:
+	def __init__(self, connection: "ApswConnection") -> None:
+		self.connection = connection
+		self._cursor = connection.raw.cursor()
+
+	# Bind failures are re-raised as the ProgrammingError sqlite3 would raise.
+	def execute(self, sql: str, parameters: Sequence = ()) -> "ApswCursor":
+		try:
+			self._cursor.execute(sql, parameters)
+		except (TypeError, OverflowError) as exc:
+			raise sqlite3.ProgrammingError(str(exc)) from exc
+		return self
+
+	def executemany(self, sql: str, seq_of_parameters: Iterable[Sequence]) -> "ApswCursor":
+		try:
+			self._cursor.executemany(sql, seq_of_parameters)
+		except (TypeError, OverflowError) as exc:
+			raise sqlite3.ProgrammingError(str(exc)) from exc
+		return self
+
+	def fetchall(self) -> List[tuple]:
+		return self._cursor.fetchall()
+
+	def __iter__(self):
+		return iter(self._cursor)
+
+	def close(self) -> None:
+		self._cursor.close()
+
+
+class ApswConnection:
+	def __init__(self, path: str) -> None:
+		self.raw = apsw.Connection(path)
+		self.raw.setbusytimeout(BUSY_TIMEOUT_MS)
+
+	def cursor(self) -> ApswCursor:
+		return ApswCursor(self)
+
+	def execute(self, sql: str, parameters: Sequence = ()) -> ApswCursor:
+		return self.cursor().execute(sql, parameters)
+
+	def getlimit(self, category: int) -> int:
+		return self.raw.limit(category)
+
+	def close(self) -> None:
+		self.raw.close()
+
+
+DatabaseConnection = Union[SQLiteConnection, ApswConnection]
+DatabaseCursor = Union[SQLiteCursor, ApswCursor]
+
+
+def connect_database(args: argparse.Namespace) -> DatabaseConnection:
 	db_path = Path(args.db_path).expanduser()
 	if not db_path.parent.exists():
 		db_path.parent.mkdir(parents=True, exist_ok=True)
-	connection = sqlite3.connect(str(db_path))
-	connection.execute("PRAGMA foreign_keys = ON;")
+	if apsw is not None:
+		connection = ApswConnection(str(db_path))
+	else:
+		connection = sqlite3.connect(str(db_path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+	if args.bulk_load:
+		connection.execute("PRAGMA foreign_keys = OFF;")
+	else:
+		connection.execute("PRAGMA foreign_keys = ON;")
+	for pragma in INGEST_PRAGMAS:
+		connection.execute(pragma)
 	return connection
 
 
-def ensure_schema(cursor: SQLiteCursor) -> None:
-	schema_statements = [
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon (
-			id INTEGER PRIMARY KEY,
-			name TEXT NOT NULL UNIQUE,
-			base_experience INTEGER,
-			height INTEGER,
-			weight INTEGER,
-			pokemon_order INTEGER,
-			is_default INTEGER,
-			location_area_encounters TEXT,
-			species_name TEXT,
-			species_color TEXT,
-			species_capture_rate INTEGER,
-			species_base_happiness INTEGER,
-			species_growth_rate TEXT,
-			habitat TEXT,
-			shape TEXT,
-			is_baby INTEGER,
-			is_legendary INTEGER,
-			is_mythical INTEGER,
-			hatch_counter INTEGER,
-			gender_rate INTEGER,
-			generation TEXT,
-			pokemon_json TEXT,
-			species_json TEXT,
-			updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_abilities (
-			pokemon_id INTEGER NOT NULL,
-			ability_name TEXT NOT NULL,
-			slot INTEGER NOT NULL,
-			is_hidden INTEGER NOT NULL,
-			PRIMARY KEY (pokemon_id, ability_name),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_types (
-			pokemon_id INTEGER NOT NULL,
-			slot INTEGER NOT NULL,
-			type_name TEXT NOT NULL,
-			PRIMARY KEY (pokemon_id, slot),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_stats (
-			pokemon_id INTEGER NOT NULL,
-			stat_name TEXT NOT NULL,
-			base_stat INTEGER NOT NULL,
-			effort INTEGER NOT NULL,
-			PRIMARY KEY (pokemon_id, stat_name),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_moves (
-			pokemon_id INTEGER NOT NULL,
-			move_name TEXT NOT NULL,
-			version_group TEXT NOT NULL,
-			learn_method TEXT NOT NULL,
-			level_learned_at INTEGER NOT NULL,
-			PRIMARY KEY (pokemon_id, move_name, version_group, learn_method, level_learned_at),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_held_items (
-			pokemon_id INTEGER NOT NULL,
-			item_name TEXT NOT NULL,
-			version_name TEXT NOT NULL,
-			rarity INTEGER NOT NULL,
-			PRIMARY KEY (pokemon_id, item_name, version_name),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_game_indices (
-			pokemon_id INTEGER NOT NULL,
-			version_name TEXT NOT NULL,
-			game_index INTEGER NOT NULL,
-			PRIMARY KEY (pokemon_id, version_name),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_forms (
-			pokemon_id INTEGER NOT NULL,
-			form_name TEXT NOT NULL,
-			PRIMARY KEY (pokemon_id, form_name),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-		"""
-		CREATE TABLE IF NOT EXISTS pokemon_past_types (
-			pokemon_id INTEGER NOT NULL,
-			generation_name TEXT NOT NULL,
-			slot INTEGER NOT NULL,
-			type_name TEXT NOT NULL,
-			PRIMARY KEY (pokemon_id, generation_name, slot),
-			FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
-		);
-		""",
-	]
-
-	for statement in schema_statements:
+SCHEMA_STATEMENTS = (
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon (
+		id INTEGER PRIMARY KEY,
+		name TEXT NOT NULL UNIQUE,
+		base_experience INTEGER,
+		height INTEGER,
+		weight INTEGER,
+		pokemon_order INTEGER,
+		is_default INTEGER,
+		location_area_encounters TEXT,
+		species_name TEXT,
+		species_color TEXT,
+		species_capture_rate INTEGER,
+		species_base_happiness INTEGER,
+		species_growth_rate TEXT,
+		habitat TEXT,
+		shape TEXT,
+		is_baby INTEGER,
+		is_legendary INTEGER,
+		is_mythical INTEGER,
+		hatch_counter INTEGER,
+		gender_rate INTEGER,
+		generation TEXT,
+		pokemon_json BLOB,
+		species_json BLOB,
+		json_codec TEXT,
+		content_hash BLOB,
+		updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_abilities (
+		pokemon_id INTEGER NOT NULL,
+		ability_name TEXT NOT NULL,
+		slot INTEGER NOT NULL,
+		is_hidden INTEGER NOT NULL,
+		PRIMARY KEY (pokemon_id, ability_name),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_types (
+		pokemon_id INTEGER NOT NULL,
+		slot INTEGER NOT NULL,
+		type_name TEXT NOT NULL,
+		PRIMARY KEY (pokemon_id, slot),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_stats (
+		pokemon_id INTEGER NOT NULL,
+		stat_name TEXT NOT NULL,
+		base_stat INTEGER NOT NULL,
+		effort INTEGER NOT NULL,
+		PRIMARY KEY (pokemon_id, stat_name),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_moves (
+		pokemon_id INTEGER NOT NULL,
+		move_name TEXT NOT NULL,
+		version_group TEXT NOT NULL,
+		learn_method TEXT NOT NULL,
+		level_learned_at INTEGER NOT NULL,
+		PRIMARY KEY (pokemon_id, move_name, version_group, learn_method, level_learned_at),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_held_items (
+		pokemon_id INTEGER NOT NULL,
+		item_name TEXT NOT NULL,
+		version_name TEXT NOT NULL,
+		rarity INTEGER NOT NULL,
+		PRIMARY KEY (pokemon_id, item_name, version_name),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_game_indices (
+		pokemon_id INTEGER NOT NULL,
+		version_name TEXT NOT NULL,
+		game_index INTEGER NOT NULL,
+		PRIMARY KEY (pokemon_id, version_name),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_forms (
+		pokemon_id INTEGER NOT NULL,
+		form_name TEXT NOT NULL,
+		PRIMARY KEY (pokemon_id, form_name),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS pokemon_past_types (
+		pokemon_id INTEGER NOT NULL,
+		generation_name TEXT NOT NULL,
+		slot INTEGER NOT NULL,
+		type_name TEXT NOT NULL,
+		PRIMARY KEY (pokemon_id, generation_name, slot),
+		FOREIGN KEY (pokemon_id) REFERENCES pokemon(id) ON DELETE CASCADE
+	);
+	""",
+)
+ADDED_POKEMON_COLUMNS = (("json_codec", "TEXT"), ("content_hash", "BLOB"))
+
+
+def ensure_schema(cursor: DatabaseCursor) -> None:
+	for statement in SCHEMA_STATEMENTS:
 		cursor.execute(statement)
 
+	existing = {row[1] for row in cursor.execute("PRAGMA table_info(pokemon)")}
+	for column, column_type in ADDED_POKEMON_COLUMNS:
+		if column not in existing:
+			cursor.execute(f"ALTER TABLE pokemon ADD COLUMN {column} {column_type}")
+
 
 def iter_pokemon_targets(
 	session: requests.Session,
@@ -264,97 +512,216 @@ def iter_pokemon_targets(
 
 	capped_page = max(1, min(page_size, MAX_PAGE_SIZE))
 	fetched = 0
-	next_url: Optional[str] = f"{API_BASE}/pokemon?offset={offset}&limit={capped_page}"
-
-	while next_url:
-		response = session.get(next_url, timeout=30)
-		response.raise_for_status()
-		payload = response.json()
+	first_url = f"{API_BASE}/pokemon?offset={offset}&limit={capped_page}"
+	for payload in iter_index_pages(session, first_url, limit):
 		for entry in payload.get("results", []):
 			if limit is not None and fetched >= limit:
 				return
 			yield entry
 			fetched += 1
-		next_url = payload.get("next")
-		if limit is not None and fetched >= limit:
-			break
 
 
-def fetch_json(session: requests.Session, url: str, delay: float) -> Dict:
+def iter_index_pages(
+	session: requests.Session,
+	url: str,
+	limit: Optional[int],
+) -> Generator[Dict, None, None]:
+	pages: queue.Queue = queue.Queue(maxsize=PAGE_PREFETCH)
+	stop = threading.Event()
+
+	def hand_over(item: object) -> None:
+		while not stop.is_set():
+			try:
+				pages.put(item, timeout=0.1)
+				return
+			except queue.Full:
+				continue
+
+	def produce() -> None:
+		next_url: Optional[str] = url
+		listed = 0
+		try:
+			while next_url and not stop.is_set():
+				payload = json_load(fetch_bytes(session, next_url))
+				hand_over(payload)
+				listed += len(payload.get("results", []))
+				if limit is not None and listed >= limit:
+					break
+				next_url = payload.get("next")
+		except Exception as exc:
+			hand_over(exc)
+		finally:
+			hand_over(None)
+
+	producer = threading.Thread(target=produce, name="index-pager", daemon=True)
+	producer.start()
+	try:
+		while True:
+			item = pages.get()
+			if item is None:
+				return
+			if isinstance(item, Exception):
+				raise item
+			yield item
+	finally:
+		stop.set()
+
+
+def fetch_bytes(session: requests.Session, url: str) -> bytes:
 	response = session.get(url, timeout=30)
 	response.raise_for_status()
-	if delay:
-		time.sleep(delay)
-	return response.json()
-
-
-def json_dump(data: Dict) -> str:
-	return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-
-
-def upsert_pokemon_row(cursor: SQLiteCursor, pokemon: Dict, species: Dict) -> None:
-	values = {
-		"id": pokemon["id"],
-		"name": pokemon["name"],
-		"base_experience": pokemon.get("base_experience"),
-		"height": pokemon.get("height"),
-		"weight": pokemon.get("weight"),
-		"pokemon_order": pokemon.get("order"),
-		"is_default": pokemon.get("is_default"),
-		"location_area_encounters": pokemon.get("location_area_encounters"),
-		"species_name": species.get("name"),
-		"species_color": species.get("color", {}).get("name") if species.get("color") else None,
-		"species_capture_rate": species.get("capture_rate"),
-		"species_base_happiness": species.get("base_happiness"),
-		"species_growth_rate": species.get("growth_rate", {}).get("name") if species.get("growth_rate") else None,
-		"habitat": species.get("habitat", {}).get("name") if species.get("habitat") else None,
-		"shape": species.get("shape", {}).get("name") if species.get("shape") else None,
-		"is_baby": species.get("is_baby"),
-		"is_legendary": species.get("is_legendary"),
-		"is_mythical": species.get("is_mythical"),
-		"hatch_counter": species.get("hatch_counter"),
-		"gender_rate": species.get("gender_rate"),
-		"generation": species.get("generation", {}).get("name") if species.get("generation") else None,
-		"pokemon_json": json_dump(pokemon),
-		"species_json": json_dump(species),
-	}
+	return response.content
+
+
+def fetch_json(session: requests.Session, url: str) -> Tuple[bytes, Dict]:
+	payload = fetch_bytes(session, url)
+	return payload, json_load(payload)
+
+
+def json_load(payload: bytes) -> Dict:
+	if orjson is not None:
+		return orjson.loads(payload)
+	return json.loads(payload)
+
+
+SIMDJSON_PARSERS = threading.local()
+
+
+def parse_species(payload: bytes) -> Dict:
+	if simdjson is None:
+		return json_load(payload)
+	parser = getattr(SIMDJSON_PARSERS, "parser", None)
+	if parser is None:
+		parser = SIMDJSON_PARSERS.parser = simdjson.Parser()
+	document = parser.parse(payload)
+	species = {key: document.get(key) for key in SPECIES_SCALAR_FIELDS}
+	for key in SPECIES_RESOURCE_FIELDS:
+		resource = document.get(key)
+		species[key] = {"name": resource.get("name")} if resource is not None else None
+	return species
 
-	columns = ", ".join(values.keys())
-	placeholders = ", ".join(["?"] * len(values))
-	updates = ", ".join([f"{column}=excluded.{column}" for column in values.keys() if column != "id"] + ["updated_at=CURRENT_TIMESTAMP"])
 
-	cursor.execute(
-		f"""
-		INSERT INTO pokemon ({columns})
+def encode_blob(raw_json: bytes) -> bytes:
+	return zlib.compress(raw_json, JSON_COMPRESSION_LEVEL)
+
+
+def content_digest(*parts: bytes) -> bytes:
+	digest = hashlib.blake2b(digest_size=16)
+	for part in parts:
+		digest.update(part)
+	return digest.digest()
+
+
+class FetchedPokemon(NamedTuple):
+	pokemon: Dict
+	species: Dict
+	pokemon_blob: bytes
+	species_blob: bytes
+	content_hash: bytes
+
+
+def build_upsert_pokemon_sql(columns: Sequence[str]) -> str:
+	placeholders = ", ".join(["?"] * len(columns))
+	updates = ", ".join([f"{column}=excluded.{column}" for column in columns if column != "id"] + ["updated_at=CURRENT_TIMESTAMP"])
+	return f"""
+		INSERT INTO pokemon ({", ".join(columns)})
 		VALUES ({placeholders})
 		ON CONFLICT(id) DO UPDATE SET {updates}
-		""",
-		list(values.values()),
+		"""
+
+
+UPSERT_POKEMON_SQL = build_upsert_pokemon_sql(POKEMON_COLUMNS)
+
+
+def pokemon_row_values(fetched: FetchedPokemon) -> tuple:
+	pokemon = fetched.pokemon
+	species = fetched.species
+	return (
+		pokemon["id"],
+		pokemon["name"],
+		pokemon.get("base_experience"),
+		pokemon.get("height"),
+		pokemon.get("weight"),
+		pokemon.get("order"),
+		pokemon.get("is_default"),
+		pokemon.get("location_area_encounters"),
+		species.get("name"),
+		species.get("color", {}).get("name") if species.get("color") else None,
+		species.get("capture_rate"),
+		species.get("base_happiness"),
+		species.get("growth_rate", {}).get("name") if species.get("growth_rate") else None,
+		species.get("habitat", {}).get("name") if species.get("habitat") else None,
+		species.get("shape", {}).get("name") if species.get("shape") else None,
+		species.get("is_baby"),
+		species.get("is_legendary"),
+		species.get("is_mythical"),
+		species.get("hatch_counter"),
+		species.get("gender_rate"),
+		species.get("generation", {}).get("name") if species.get("generation") else None,
+		fetched.pokemon_blob,
+		fetched.species_blob,
+		JSON_CODEC,
+		fetched.content_hash,
 	)
 
 
-def reset_and_insert(
-	cursor: SQLiteCursor,
-	delete_sql: str,
+def max_sql_variables(cursor: DatabaseCursor) -> int:
+	if isinstance(cursor, ApswCursor):
+		return cursor.connection.getlimit(apsw.SQLITE_LIMIT_VARIABLE_NUMBER)
+	getlimit = getattr(cursor.connection, "getlimit", None)
+	if getlimit is None:
+		return DEFAULT_MAX_SQL_VARIABLES
+	return getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+
+def build_child_upsert_sql(table: str, columns: Sequence[str], key: Sequence[str]) -> Tuple[str, str]:
+	updates = [f"{column}=excluded.{column}" for column in columns if column not in key]
+	if updates:
+		conflict = f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {', '.join(updates)}"
+	else:
+		conflict = "ON CONFLICT DO NOTHING"
+	return f"INSERT INTO {table} ({', '.join(columns)})", conflict
+
+
+CHILD_UPSERT_SQL = {
+	table: build_child_upsert_sql(table, columns, key)
+	for table, (columns, key) in CHILD_TABLES.items()
+}
+
+
+def insert_rows(
+	cursor: DatabaseCursor,
 	insert_sql: str,
-	rows: Iterable[tuple],
-	delete_args: tuple,
+	entries: Sequence[tuple],
+	conflict_sql: str = "",
 ) -> None:
-	cursor.execute(delete_sql, delete_args)
-	entries = list(rows)
-	if entries:
-		unique_entries = list(dict.fromkeys(entries))
-		cursor.executemany(insert_sql, unique_entries)
+	if not entries:
+		return
+	width = len(entries[0])
+	group = "(" + ", ".join(["?"] * width) + ")"
+	chunk_size = max(1, max_sql_variables(cursor) // width)
+	for start in range(0, len(entries), chunk_size):
+		chunk = entries[start:start + chunk_size]
+		cursor.execute(
+			f"{insert_sql} VALUES {', '.join([group] * len(chunk))} {conflict_sql}",
+			[value for entry in chunk for value in entry],
+		)
 
 
-def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
-	pokemon_id = pokemon["id"]
+def delete_child_rows(cursor: DatabaseCursor, table: str, pokemon_ids: Sequence[int]) -> None:
+	chunk_size = max_sql_variables(cursor)
+	for start in range(0, len(pokemon_ids), chunk_size):
+		chunk = pokemon_ids[start:start + chunk_size]
+		cursor.execute(
+			f"DELETE FROM {table} WHERE pokemon_id IN ({', '.join(['?'] * len(chunk))})",
+			chunk,
+		)
+
 
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_abilities WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_abilities (pokemon_id, ability_name, slot, is_hidden) VALUES (?, ?, ?, ?)",
-		(
+def child_rows(pokemon: Dict) -> Dict[str, List[tuple]]:
+	pokemon_id = pokemon["id"]
+	rows = {
+		"pokemon_abilities": (
 			(
 				pokemon_id,
 				ability["ability"]["name"],
@@ -363,14 +730,7 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			)
 			for ability in pokemon.get("abilities", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_types WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_types (pokemon_id, slot, type_name) VALUES (?, ?, ?)",
-		(
+		"pokemon_types": (
 			(
 				pokemon_id,
 				poke_type["slot"],
@@ -378,14 +738,7 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			)
 			for poke_type in pokemon.get("types", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_stats WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_stats (pokemon_id, stat_name, base_stat, effort) VALUES (?, ?, ?, ?)",
-		(
+		"pokemon_stats": (
 			(
 				pokemon_id,
 				stat["stat"]["name"],
@@ -394,14 +747,7 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			)
 			for stat in pokemon.get("stats", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_moves WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_moves (pokemon_id, move_name, version_group, learn_method, level_learned_at) VALUES (?, ?, ?, ?, ?)",
-		(
+		"pokemon_moves": (
 			(
 				pokemon_id,
 				move["move"]["name"],
@@ -412,14 +758,7 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			for move in pokemon.get("moves", [])
 			for detail in move.get("version_group_details", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_held_items WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_held_items (pokemon_id, item_name, version_name, rarity) VALUES (?, ?, ?, ?)",
-		(
+		"pokemon_held_items": (
 			(
 				pokemon_id,
 				item["item"]["name"],
@@ -429,14 +768,7 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			for item in pokemon.get("held_items", [])
 			for version in item.get("version_details", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_game_indices WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_game_indices (pokemon_id, version_name, game_index) VALUES (?, ?, ?)",
-		(
+		"pokemon_game_indices": (
 			(
 				pokemon_id,
 				entry["version"]["name"],
@@ -444,28 +776,14 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			)
 			for entry in pokemon.get("game_indices", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_forms WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_forms (pokemon_id, form_name) VALUES (?, ?)",
-		(
+		"pokemon_forms": (
 			(
 				pokemon_id,
 				form.get("name"),
 			)
 			for form in pokemon.get("forms", [])
 		),
-		(pokemon_id,),
-	)
-
-	reset_and_insert(
-		cursor,
-		"DELETE FROM pokemon_past_types WHERE pokemon_id = ?",
-		"INSERT INTO pokemon_past_types (pokemon_id, generation_name, slot, type_name) VALUES (?, ?, ?, ?)",
-		(
+		"pokemon_past_types": (
 			(
 				pokemon_id,
 				past_type.get("generation", {}).get("name"),
@@ -475,70 +793,248 @@ def sync_collections(cursor: SQLiteCursor, pokemon: Dict) -> None:
 			for past_type in pokemon.get("past_types", [])
 			for t in past_type.get("types", [])
 		),
-		(pokemon_id,),
-	)
+	}
+	return {table: list(entries) for table, entries in rows.items()}
+
+
+class PendingRecord(NamedTuple):
+	name: str
+	values: tuple
+	children: Dict[str, List[tuple]]
+	prune: bool
 
 
-def process_pokemon(
+class BatchWriter:
+	"""Buffers changed Pokémon and writes them to SQLite one batch at a time."""
+
+	def __init__(self, cursor: DatabaseCursor, reconcile: bool = False) -> None:
+		self.cursor = cursor
+		self.reconcile = reconcile
+		self.records: List[PendingRecord] = []
+		self.unchanged = 0
+		self.known_hashes: Dict[int, Optional[bytes]] = dict(
+			cursor.execute("SELECT id, content_hash FROM pokemon").fetchall()
+		)
+
+	def __len__(self) -> int:
+		return len(self.records)
+
+	def add(self, fetched: FetchedPokemon) -> bool:
+		pokemon = fetched.pokemon
+		pokemon_id = pokemon["id"]
+		exists = pokemon_id in self.known_hashes
+		if not self.reconcile and exists and self.known_hashes[pokemon_id] == fetched.content_hash:
+			self.unchanged += 1
+			return False
+		self.records.append(
+			PendingRecord(
+				pokemon["name"],
+				pokemon_row_values(fetched),
+				child_rows(pokemon),
+				exists,
+			)
+		)
+		return True
+
+	def flush(self) -> int:
+		records, self.records = self.records, []
+		if not records:
+			return 0
+		self.cursor.execute("SAVEPOINT batch")
+		try:
+			self._write(records)
+			failed = False
+		except DATABASE_ERRORS as exc:
+			self.cursor.execute("ROLLBACK TO batch")
+			logging.warning("Batch of %s Pokémon failed (%s); retrying one by one", len(records), exc)
+			failed = True
+		# Replayed outside the except block so record errors aren't chained to the batch error.
+		written = self._write_individually(records) if failed else len(records)
+		self.cursor.execute("RELEASE batch")
+		return written
+
+	def _write(self, records: Sequence[PendingRecord]) -> None:
+		self.cursor.executemany(UPSERT_POKEMON_SQL, [record.values for record in records])
+		pokemon_ids = [record.values[0] for record in records]
+		prune_ids = [record.values[0] for record in records if record.prune]
+		for table, (insert_sql, conflict_sql) in CHILD_UPSERT_SQL.items():
+			if prune_ids:
+				delete_child_rows(self.cursor, table, prune_ids)
+			insert_rows(
+				self.cursor,
+				insert_sql,
+				[row for record in records for row in record.children[table]],
+				conflict_sql,
+			)
+		for pokemon_id, record in zip(pokemon_ids, records):
+			self.known_hashes[pokemon_id] = record.values[-1]
+
+	def _write_individually(self, records: Sequence[PendingRecord]) -> int:
+		written = 0
+		for record in records:
+			self.cursor.execute("SAVEPOINT pokemon")
+			try:
+				self._write([record])
+				written += 1
+			except DATABASE_ERRORS:
+				self.cursor.execute("ROLLBACK TO pokemon")
+				logging.exception("Failed to store %s", record.name)
+			self.cursor.execute("RELEASE pokemon")
+		return written
+
+
+class CachedSpecies(NamedTuple):
+	data: Dict
+	blob: bytes
+	digest: bytes
+
+
+class SpeciesCache:
+	def __init__(self) -> None:
+		self._entries: Dict[str, CachedSpecies] = {}
+		self._lock = threading.Lock()
+
+	def get(self, session: requests.Session, url: str) -> CachedSpecies:
+		with self._lock:
+			entry = self._entries.get(url)
+		if entry is None:
+			entry = fetch_species(session, url)
+			with self._lock:
+				entry = self._entries.setdefault(url, entry)
+		return entry
+
+
+def fetch_species(session: requests.Session, url: str) -> CachedSpecies:
+	payload = fetch_bytes(session, url)
+	return CachedSpecies(parse_species(payload), encode_blob(payload), content_digest(payload))
+
+
+def fetch_pokemon(
 	session: requests.Session,
-	cursor: SQLiteCursor,
 	target: Dict[str, str],
-	delay: float,
-) -> None:
-	pokemon_data = fetch_json(session, target["url"], delay)
+	species_cache: SpeciesCache,
+) -> FetchedPokemon:
+	pokemon_json, pokemon_data = fetch_json(session, target["url"])
 	species_url = pokemon_data.get("species", {}).get("url")
 	if not species_url:
 		raise RuntimeError(f"Missing species URL for Pokémon {pokemon_data.get('name')}")
-	species_data = fetch_json(session, species_url, delay)
+	species = species_cache.get(session, species_url)
+	return FetchedPokemon(
+		pokemon_data,
+		species.data,
+		encode_blob(pokemon_json),
+		species.blob,
+		content_digest(pokemon_json, species.digest),
+	)
 
-	upsert_pokemon_row(cursor, pokemon_data, species_data)
-	sync_collections(cursor, pokemon_data)
 
+def iter_fetched(
+	session: requests.Session,
+	targets: Iterable[Dict[str, str]],
+	concurrency: int,
+) -> Generator[Tuple[Dict[str, str], Future], None, None]:
+	workers = max(1, concurrency)
+	species_cache = SpeciesCache()
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		pending: deque = deque()
+		for target in targets:
+			pending.append((target, executor.submit(fetch_pokemon, session, target, species_cache)))
+			if len(pending) >= workers * 2:
+				yield pending.popleft()
+		while pending:
+			yield pending.popleft()
 
-def main() -> int:
-	args = parse_args()
-	configure_logging(args.log_level)
-	session = build_session(args.max_retries, args.backoff)
+
+def check_foreign_keys(cursor: DatabaseCursor) -> bool:
+	orphans: Dict[str, List[int]] = {}
+	for table, rowid, _parent, _fkid in cursor.execute("PRAGMA foreign_key_check").fetchall():
+		orphans.setdefault(table, []).append(rowid)
+	for table, rowids in orphans.items():
+		logging.error(
+			"Foreign key check found %s orphaned rows in %s (rowids: %s)",
+			len(rowids),
+			table,
+			", ".join(map(str, rowids)),
+		)
+	return not orphans
+
+
+def run(args: argparse.Namespace) -> int:
+	"""Run one sync from already-parsed arguments and return the exit status."""
+	cache_path = Path(args.db_path).expanduser().with_suffix(".httpcache") if args.http_cache else None
+	limiter = RateLimiter(args.sleep)
+	session = build_session(
+		args.max_retries,
+		args.backoff,
+		args.concurrency + 1,
+		cache_path=cache_path,
+		cache_expire=args.http_cache_expire,
+		limiter=limiter,
+	)
 
 	try:
 		connection = connect_database(args)
-	except SQLiteError as exc:
+	except DATABASE_ERRORS as exc:
 		logging.error("Database connection failed: %s", exc)
+		session.close()
 		return 1
 
 	processed = 0
+	status = 0
 	cursor = connection.cursor()
-	ensure_schema(cursor)
-	connection.commit()
 
 	try:
-		for target in iter_pokemon_targets(
+		ensure_schema(cursor)
+		writer = BatchWriter(cursor, reconcile=args.reconcile)
+		cursor.execute("BEGIN")
+		targets = iter_pokemon_targets(
 			session,
 			names=args.names,
 			limit=args.limit,
 			offset=args.offset,
 			page_size=args.page_size,
-		):
+		)
+		for target, future in iter_fetched(session, targets, args.concurrency):
 			try:
-				process_pokemon(session, cursor, target, args.sleep)
+				fetched = future.result()
+			except Exception:
+				logging.exception("Failed to fetch %s", target.get("name"))
+				continue
+			try:
+				writer.add(fetched)
 			except Exception:
-				connection.rollback()
 				logging.exception("Failed to process %s", target.get("name"))
 				continue
 
-			processed += 1
-			if processed % args.batch_size == 0:
-				connection.commit()
+			if len(writer) >= args.batch_size:
+				processed += writer.flush()
+				cursor.execute("COMMIT")
+				cursor.execute("BEGIN")
 				logging.info("Committed %s Pokémon", processed)
 
-		if processed % args.batch_size != 0:
-			connection.commit()
+		processed += writer.flush()
+		cursor.execute("COMMIT")
+
+		if args.bulk_load and not check_foreign_keys(cursor):
+			status = 1
 	finally:
 		cursor.close()
 		connection.close()
+		session.close()
+
+	logging.info(
+		"Completed sync for %s Pokémon (%s unchanged, %s network requests)",
+		processed,
+		writer.unchanged,
+		limiter.acquired,
+	)
+	return status
 
-	logging.info("Completed sync for %s Pokémon", processed)
-	return 0
+
+def main() -> int:
+	args = parse_args()
+	configure_logging(args.log_level)
+	return run(args)
 
 
 if __name__ == "__main__":